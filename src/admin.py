@@ -1,7 +1,165 @@
 import os
-from flask_admin import Admin
-from models import db, User, Character, Planet, Favorites
+import io
+import csv
+import time
+from flask import Response, g, request, flash, redirect, stream_with_context
+from flask_admin import Admin, expose
+from models import db, User, Character, Planet, Vehicle, Favorites
+from changes import bulk_insert
 from flask_admin.contrib.sqla import ModelView
+from sqlalchemy import func, literal, select, text
+
+# Rows per batch for bulk import/export, and how long exact counts are cached
+BULK_BATCH_SIZE = 1000
+COUNT_CACHE_SECONDS = 60
+
+_count_cache = {}
+
+
+def estimate_row_count(session, model):
+    """Row count for the admin pager without a full COUNT(*) on every page.
+
+    PostgreSQL uses the planner estimate from pg_class, other databases
+    (or tables PostgreSQL has never analyzed) use a COUNT(*) cached for
+    COUNT_CACHE_SECONDS.
+    """
+    table_name = model.__tablename__
+    if session.get_bind().dialect.name == "postgresql":
+        estimate = session.execute(
+            text("SELECT reltuples::bigint FROM pg_class WHERE relname = :name"),
+            {"name": table_name}).scalar()
+        if estimate is not None and estimate >= 0:
+            return estimate
+
+    cached = _count_cache.get(table_name)
+    if cached and time.monotonic() - cached[1] < COUNT_CACHE_SECONDS:
+        return cached[0]
+    count = session.execute(select(func.count()).select_from(model)).scalar()
+    _count_cache[table_name] = (count, time.monotonic())
+    return count
+
+
+class LargeTableView(ModelView):
+    """ModelView for big tables: estimated counts on unfiltered lists and streaming CSV import/export."""
+    list_template = 'admin/model/bulk_list.html'
+    page_size = 50
+    can_set_page_size = True
+
+    def get_list(self, page, sort_column, sort_desc, search, filters, *args, **kwargs):
+        # Only the unfiltered list can use an estimate, filtered counts must be exact
+        g.admin_estimate_count = not (search or filters)
+        return super().get_list(page, sort_column, sort_desc, search, filters, *args, **kwargs)
+
+    def get_count_query(self):
+        if g.get('admin_estimate_count'):
+            return self.session.query(literal(estimate_row_count(self.session, self.model)))
+        return super().get_count_query()
+
+    @expose('/bulk-export/')
+    def bulk_export(self):
+        """Stream the whole table as CSV, fetching BULK_BATCH_SIZE rows at a time."""
+        table = self.model.__table__
+        columns = [column.name for column in table.columns]
+
+        def generate():
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            rows = self.session.execute(
+                select(table).order_by(*table.primary_key.columns)
+                .execution_options(yield_per=BULK_BATCH_SIZE))
+            for partition in rows.partitions():
+                writer.writerows(partition)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+
+        filename = f"{table.name}.csv"
+        return Response(stream_with_context(generate()), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+    @expose('/bulk-import/', methods=['POST'])
+    def bulk_import(self):
+        """Insert rows from an uploaded CSV (header = column names) in batches of BULK_BATCH_SIZE.
+
+        Primary keys in the file are ignored and the database assigns new ones,
+        so a bulk_export file can be imported again without id collisions or
+        leaving the PostgreSQL id sequence behind.
+        """
+        upload = request.files.get('file')
+        if not upload:
+            flash('Choose a CSV file to import.', 'error')
+            return redirect(self.get_url('.index_view'))
+
+        table = self.model.__table__
+        reader = csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8'))
+        batch = []
+        imported = 0
+        try:
+            for row in reader:
+                batch.append(self._coerce_row(table, row))
+                if len(batch) >= BULK_BATCH_SIZE:
+                    imported += bulk_insert(table, batch)
+                    batch = []
+            if batch:
+                imported += bulk_insert(table, batch)
+            self.session.commit()
+        except Exception as error:
+            self.session.rollback()
+            flash(f'Import failed: {error}', 'error')
+            return redirect(self.get_url('.index_view'))
+
+        _count_cache.pop(table.name, None)
+        flash(f'Imported {imported} rows.', 'success')
+        return redirect(self.get_url('.index_view'))
+
+    @staticmethod
+    def _coerce_row(table, row):
+        """Convert CSV strings to the column types, empty cells become NULL and primary keys are dropped."""
+        values = {}
+        for name, value in row.items():
+            if name not in table.columns or table.columns[name].primary_key:
+                continue
+            if value is None or value == '':
+                values[name] = None
+            else:
+                values[name] = table.columns[name].type.python_type(value)
+        return values
+
+
+class UserView(LargeTableView):
+    column_searchable_list = ('email',)
+    column_filters = ('email',)
+
+
+class CharacterView(LargeTableView):
+    column_searchable_list = ('name',)
+    column_filters = ('name', 'species', 'homeworld')
+
+
+class PlanetView(LargeTableView):
+    column_searchable_list = ('name',)
+    column_filters = ('name', 'climate')
+
+
+class VehicleView(LargeTableView):
+    column_searchable_list = ('name',)
+    column_filters = ('name', 'manufacturer')
+
+
+class FavoritesView(LargeTableView):
+    # Related rows are joined into the list query instead of lazy-loaded per row
+    column_list = ('id', 'user', 'character', 'planet', 'vehicle')
+    column_select_related_list = (Favorites.user, Favorites.character,
+                                  Favorites.planet, Favorites.vehicle)
+    column_filters = ('user_id', 'character_id', 'planet_id', 'vehicle_id')
+    column_formatters = {
+        'user': lambda v, c, m, p: m.user.email if m.user else None,
+        'character': lambda v, c, m, p: m.character.name if m.character else None,
+        'planet': lambda v, c, m, p: m.planet.name if m.planet else None,
+        'vehicle': lambda v, c, m, p: m.vehicle.name if m.vehicle else None,
+    }
 
 
 def setup_admin(app):
@@ -10,7 +168,8 @@ def setup_admin(app):
     admin = Admin(app, name='StarWars Admin', template_mode='bootstrap3')
 
     # Add models to Flask Admin
-    admin.add_view(ModelView(User, db.session))
-    admin.add_view(ModelView(Character, db.session))
-    admin.add_view(ModelView(Planet, db.session))
-    admin.add_view(ModelView(Favorites, db.session))
+    admin.add_view(UserView(User, db.session))
+    admin.add_view(CharacterView(Character, db.session))
+    admin.add_view(PlanetView(Planet, db.session))
+    admin.add_view(VehicleView(Vehicle, db.session))
+    admin.add_view(FavoritesView(Favorites, db.session))
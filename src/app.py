@@ -2,63 +2,157 @@
 This module takes care of starting the API Server, Loading the DB and Adding the endpoints
 """
 import os
-from flask import Flask, request, jsonify, url_for
-from flask_migrate import Migrate
+from flask import Flask, Blueprint, request, jsonify, url_for, current_app
 from flask_cors import CORS
-from utils import APIException, generate_sitemap
-from admin import setup_admin
+from utils import APIException, generate_sitemap, parse_ids, get_by_ids
 from models import db, User, Character, Planet, Vehicle, Favorites
 from models import fetch_swapi_data  # Import SWAPI fetch function
+from snapshot import snapshot_cli
+from sqlite_profile import apply_sqlite_profile, is_enabled as sqlite_profile_enabled
+from changes import (CursorExpired, changes_cli, changes_since, latest_cursor,
+                     track_changes, wait_for_changes)
+
+# Deployment modes: "full" serves everything, "api" skips the admin and
+# migration wiring, "admin" serves only the admin (and owns migrations).
+APP_MODES = ("full", "api", "admin")
+
+# Change feed page size and long-poll limits. Long-polling holds a worker
+# for the whole wait, so it stays off unless gunicorn runs threaded or async
+# workers and CHANGES_MAX_WAIT_SECONDS is set.
+CHANGES_PAGE_SIZE = 100
+CHANGES_MAX_PAGE_SIZE = 1000
+CHANGES_MAX_WAIT_SECONDS = float(os.environ.get("CHANGES_MAX_WAIT_SECONDS") or 0)
+
+# Most ids a batch lookup (or all resources of a /resolve call) may ask for
+BATCH_MAX_IDS = 100
+
+api = Blueprint('api', __name__)
+
+
+def create_app(mode=None):
+    """Build a Flask app for the given deployment mode (defaults to APP_MODE)."""
+    mode = mode or os.environ.get("APP_MODE", "full")
+    if mode not in APP_MODES:
+        raise ValueError(f"Unknown APP_MODE {mode!r}, expected one of {APP_MODES}")
+
+    app = Flask(__name__)
+    app.url_map.strict_slashes = False
+
+    db_url = os.getenv("DATABASE_URL")
+    if db_url is not None:
+        app.config['SQLALCHEMY_DATABASE_URI'] = db_url.replace(
+            "postgres://", "postgresql://")
+    else:
+        app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:////tmp/test.db"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+
+    db.init_app(app)
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith("sqlite") and sqlite_profile_enabled():
+        with app.app_context():
+            apply_sqlite_profile(db.engine)
+    app.cli.add_command(snapshot_cli)
+    app.cli.add_command(changes_cli)
+    track_changes()
+
+    # Admin and migrations are imported lazily so API-only workers never load them
+    if mode != "api":
+        from flask_migrate import Migrate
+        from admin import setup_admin
+        Migrate(app, db)
+        setup_admin(app)
+
+    if mode != "admin":
+        CORS(app)
+        app.register_blueprint(api)
+
+    return app
 
-app = Flask(__name__)
-app.url_map.strict_slashes = False
-
-db_url = os.getenv("DATABASE_URL")
-if db_url is not None:
-    app.config['SQLALCHEMY_DATABASE_URI'] = db_url.replace(
-        "postgres://", "postgresql://")
-else:
-    app.config['SQLALCHEMY_DATABASE_URI'] = "sqlite:////tmp/test.db"
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-MIGRATE = Migrate(app, db)
-db.init_app(app)
-CORS(app)
-setup_admin(app)
 
 # Handle/serialize errors like a JSON object
 
 
-@app.errorhandler(APIException)
+@api.app_errorhandler(APIException)
 def handle_invalid_usage(error):
     return jsonify(error.to_dict()), error.status_code
 
 # Generate sitemap with all endpoints
 
 
-@app.route('/')
+@api.route('/')
 def sitemap():
-    return generate_sitemap(app)
+    return generate_sitemap(current_app)
 
 # -------------------- Fetch --------------------
 
 
-@app.route('/fetch-swapi', methods=['GET'])
+@api.route('/fetch-swapi', methods=['GET'])
 def fetch_swapi():
     """Fetch data from SWAPI.dev and store it in the database."""
     fetch_swapi_data()
     return jsonify({"message": "SWAPI data fetched successfully!"}), 200
 
+# -------------------- CHANGES --------------------
+
+
+@api.route('/changes', methods=['GET'])
+def get_changes():
+    """Changes after the `since` cursor, waiting up to `wait` seconds for new ones when there are none."""
+    since = request.args.get('since', 0, type=int)
+    limit = request.args.get('limit', CHANGES_PAGE_SIZE, type=int)
+    wait = request.args.get('wait', 0, type=float)
+    if limit < 1 or limit > CHANGES_MAX_PAGE_SIZE:
+        return jsonify({"error": f"limit must be between 1 and {CHANGES_MAX_PAGE_SIZE}"}), 400
+    wait = max(0, min(wait, CHANGES_MAX_WAIT_SECONDS))
+
+    try:
+        changes, has_more = changes_since(since, limit)
+        if not changes and wait and wait_for_changes(since, wait):
+            changes, has_more = changes_since(since, limit)
+    except CursorExpired:
+        return jsonify({
+            "error": "Cursor expired, download the full dataset again and resume from cursor",
+            "cursor": latest_cursor()
+        }), 410
+
+    cursor = changes[-1]["cursor"] if changes else since
+    return jsonify({"changes": changes, "cursor": cursor, "has_more": has_more}), 200
+
+# -------------------- RESOLVE --------------------
+
+# Query parameter of /resolve -> model
+RESOLVABLE = {
+    "character": Character,
+    "planets": Planet,
+    "vehicles": Vehicle,
+}
+
+
+@api.route('/resolve', methods=['GET'])
+def resolve():
+    """Resolve ids of several resources at once, e.g. /resolve?character=1,2&planets=3, one query per resource."""
+    requested = {name: parse_ids(request.args[name], BATCH_MAX_IDS)
+                 for name in RESOLVABLE if name in request.args}
+    if not requested:
+        raise APIException(f"Pass ids for at least one of: {', '.join(RESOLVABLE)}")
+    if sum(len(ids) for ids in requested.values()) > BATCH_MAX_IDS:
+        raise APIException(f"At most {BATCH_MAX_IDS} ids can be requested at once")
+
+    response = {}
+    for name, ids in requested.items():
+        results, missing = get_by_ids(RESOLVABLE[name], ids)
+        response[name] = {"results": results, "missing": missing}
+    return jsonify(response), 200
+
 # -------------------- USERS --------------------
 
 
-@app.route('/user', methods=['GET'])
+@api.route('/user', methods=['GET'])
 def get_users():
     users = User.query.all()
     return jsonify([user.serialize() for user in users]), 200
 
 
-@app.route('/user', methods=['POST'])
+@api.route('/user', methods=['POST'])
 def create_user():
     data = request.json
     if "email" not in data:
@@ -72,13 +166,16 @@ def create_user():
 # -------------------- CHARACTERS --------------------
 
 
-@app.route('/character', methods=['GET'])
+@api.route('/character', methods=['GET'])
 def get_characters():
+    if 'ids' in request.args:
+        results, missing = get_by_ids(Character, parse_ids(request.args['ids'], BATCH_MAX_IDS))
+        return jsonify({"results": results, "missing": missing}), 200
     characters = Character.query.all()
     return jsonify([char.serialize() for char in characters]), 200
 
 
-@app.route('/character/<int:character_id>', methods=['GET'])
+@api.route('/character/<int:character_id>', methods=['GET'])
 def get_character(character_id):
     character = Character.query.get(character_id)
     if not character:
@@ -86,7 +183,7 @@ def get_character(character_id):
     return jsonify(character.serialize()), 200
 
 
-@app.route('/character', methods=['POST'])
+@api.route('/character', methods=['POST'])
 def create_character():
     data = request.json
     if "name" not in data:
@@ -103,7 +200,7 @@ def create_character():
     return jsonify(new_character.serialize()), 201
 
 
-@app.route('/character/<int:character_id>', methods=['DELETE'])
+@api.route('/character/<int:character_id>', methods=['DELETE'])
 def delete_character(character_id):
     character = Character.query.get(character_id)
     if not character:
@@ -115,13 +212,16 @@ def delete_character(character_id):
 # -------------------- PLANETS --------------------
 
 
-@app.route('/planets', methods=['GET'])
+@api.route('/planets', methods=['GET'])
 def get_planets():
+    if 'ids' in request.args:
+        results, missing = get_by_ids(Planet, parse_ids(request.args['ids'], BATCH_MAX_IDS))
+        return jsonify({"results": results, "missing": missing}), 200
     planets = Planet.query.all()
     return jsonify([planet.serialize() for planet in planets]), 200
 
 
-@app.route('/planets/<int:planet_id>', methods=['GET'])
+@api.route('/planets/<int:planet_id>', methods=['GET'])
 def get_planet(planet_id):
     planet = Planet.query.get(planet_id)
     if not planet:
@@ -129,7 +229,7 @@ def get_planet(planet_id):
     return jsonify(planet.serialize()), 200
 
 
-@app.route('/planets', methods=['POST'])
+@api.route('/planets', methods=['POST'])
 def create_planet():
     data = request.json
     if "name" not in data:
@@ -146,7 +246,7 @@ def create_planet():
     return jsonify(new_planet.serialize()), 201
 
 
-@app.route('/planets/<int:planet_id>', methods=['DELETE'])
+@api.route('/planets/<int:planet_id>', methods=['DELETE'])
 def delete_planet(planet_id):
     planet = Planet.query.get(planet_id)
     if not planet:
@@ -158,13 +258,16 @@ def delete_planet(planet_id):
 # -------------------- VEHICLES --------------------
 
 
-@app.route('/vehicles', methods=['GET'])
+@api.route('/vehicles', methods=['GET'])
 def get_vehicles():
+    if 'ids' in request.args:
+        results, missing = get_by_ids(Vehicle, parse_ids(request.args['ids'], BATCH_MAX_IDS))
+        return jsonify({"results": results, "missing": missing}), 200
     vehicles = Vehicle.query.all()
     return jsonify([vehicle.serialize() for vehicle in vehicles]), 200
 
 
-@app.route('/vehicles/<int:vehicle_id>', methods=['GET'])
+@api.route('/vehicles/<int:vehicle_id>', methods=['GET'])
 def get_vehicle(vehicle_id):
     vehicle = Vehicle.query.get(vehicle_id)
     if not vehicle:
@@ -172,7 +275,7 @@ def get_vehicle(vehicle_id):
     return jsonify(vehicle.serialize()), 200
 
 
-@app.route('/vehicles', methods=['POST'])
+@api.route('/vehicles', methods=['POST'])
 def create_vehicle():
     data = request.json
     if "name" not in data:
@@ -193,7 +296,7 @@ def create_vehicle():
     return jsonify(new_vehicle.serialize()), 201
 
 
-@app.route('/vehicles/<int:vehicle_id>', methods=['DELETE'])
+@api.route('/vehicles/<int:vehicle_id>', methods=['DELETE'])
 def delete_vehicle(vehicle_id):
     vehicle = Vehicle.query.get(vehicle_id)
     if not vehicle:
@@ -205,13 +308,13 @@ def delete_vehicle(vehicle_id):
 # -------------------- FAVORITES --------------------
 
 
-@app.route('/favorites', methods=['GET'])
+@api.route('/favorites', methods=['GET'])
 def get_favorites():
     favorites = Favorites.query.all()
     return jsonify([fav.serialize() for fav in favorites]), 200
 
 
-@app.route('/favorite/vehicle/<int:vehicle_id>', methods=['POST'])
+@api.route('/favorite/vehicle/<int:vehicle_id>', methods=['POST'])
 def add_favorite_vehicle(vehicle_id):
     data = request.json
     user = User.query.get(data["user_id"])
@@ -226,7 +329,7 @@ def add_favorite_vehicle(vehicle_id):
     return jsonify(new_fav.serialize()), 201
 
 
-@app.route('/favorite/vehicle/<int:vehicle_id>', methods=['DELETE'])
+@api.route('/favorite/vehicle/<int:vehicle_id>', methods=['DELETE'])
 def delete_favorite_vehicle(vehicle_id):
     data = request.json
     fav = Favorites.query.filter_by(
@@ -237,31 +340,9 @@ def delete_favorite_vehicle(vehicle_id):
     db.session.commit()
     return jsonify({"message": "Favorite vehicle removed"}), 200
 
-# -------------------- CHARACTERS --------------------
-
-@app.route('/character/<int:character_id>', methods=['DELETE'])
-def delete_character(character_id):
-    character = Character.query.get(character_id)
-    if not character:
-        return jsonify({"error": "Character not found"}), 404
-    db.session.delete(character)
-    db.session.commit()
-    return jsonify({"message": "Character deleted"}), 200
-
-# -------------------- PLANETS --------------------
-
-@app.route('/planets/<int:planet_id>', methods=['DELETE'])
-def delete_planet(planet_id):
-    planet = Planet.query.get(planet_id)
-    if not planet:
-        return jsonify({"error": "Planet not found"}), 404
-    db.session.delete(planet)
-    db.session.commit()
-    return jsonify({"message": "Planet deleted"}), 200
-
 # -------------------- DELETE FAVORITE CHARACTERS --------------------
 
-@app.route('/favorite/character/<int:character_id>', methods=['DELETE'])
+@api.route('/favorite/character/<int:character_id>', methods=['DELETE'])
 def delete_favorite_character(character_id):
     data = request.json
     fav = Favorites.query.filter_by(user_id=data["user_id"], character_id=character_id).first()
@@ -275,7 +356,7 @@ def delete_favorite_character(character_id):
 
 # -------------------- DELETE FAVORITE PLANETS --------------------
 
-@app.route('/favorite/planet/<int:planet_id>', methods=['DELETE'])
+@api.route('/favorite/planet/<int:planet_id>', methods=['DELETE'])
 def delete_favorite_planet(planet_id):
     data = request.json
     fav = Favorites.query.filter_by(user_id=data["user_id"], planet_id=planet_id).first()
@@ -288,9 +369,8 @@ def delete_favorite_planet(planet_id):
     return jsonify({"message": "Favorite planet removed"}), 200
 
 
-
-
 # Run the API
 if __name__ == '__main__':
+    app = create_app()
     PORT = int(os.environ.get('PORT', 3000))
     app.run(host='0.0.0.0', port=PORT, debug=False)
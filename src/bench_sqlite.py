@@ -0,0 +1,102 @@
+"""
+Concurrent read/write benchmark for the SQLite fallback database: SQLite
+defaults, the profile's pragmas alone, and pragmas plus the cross-process
+writer lock (see sqlite_profile.py).
+
+Each worker is a separate process, like gunicorn workers, running
+`threads` threads (like gthread workers). Writers call
+POST /favorite/vehicle/<id> (reads the user and vehicle, then inserts),
+readers call GET /character/<id>, against a fresh database file.
+
+Usage: python src/bench_sqlite.py [writers] [readers] [seconds] [threads]
+"""
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+import multiprocessing
+
+CONFIGURATIONS = (
+    ("defaults", {"SQLITE_PROFILE": "off", "SQLITE_WRITER_LOCK": "off"}),
+    ("pragmas only", {"SQLITE_PROFILE": "on", "SQLITE_WRITER_LOCK": "off"}),
+    ("pragmas + writer lock", {"SQLITE_PROFILE": "on", "SQLITE_WRITER_LOCK": "on"}),
+)
+
+
+def _worker(kind, db_path, settings, seconds, threads, results):
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.update(settings)
+    from app import create_app
+    app = create_app("api")
+    app.logger.setLevel(logging.CRITICAL)
+    counts = []
+
+    def loop():
+        client = app.test_client()
+        ok = errors = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            if kind == "write":
+                response = client.post(f'/favorite/vehicle/{ok % 100 + 1}', json={"user_id": 1})
+            else:
+                response = client.get(f'/character/{ok % 100 + 1}')
+            if response.status_code < 500:
+                ok += 1
+            else:
+                errors += 1
+        counts.append((ok, errors))
+
+    workers = [threading.Thread(target=loop) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((kind, sum(ok for ok, _ in counts), sum(errors for _, errors in counts)))
+
+
+def run(settings, writers, readers, seconds, threads):
+    """Return {kind: (requests per second, errors)} for one configuration."""
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.update(settings)
+    from app import create_app
+    from models import db, User, Character, Vehicle
+    app = create_app("api")
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(email="bench@example.com"))
+        db.session.execute(Character.__table__.insert(), [{"name": f"Seed {i}"} for i in range(100)])
+        db.session.execute(Vehicle.__table__.insert(), [{"name": f"Seed {i}"} for i in range(100)])
+        db.session.commit()
+        db.engine.dispose()
+
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_worker, args=(kind, db_path, settings, seconds, threads, results))
+               for kind in ["write"] * writers + ["read"] * readers]
+    for worker in workers:
+        worker.start()
+    totals = {"write": [0, 0], "read": [0, 0]}
+    for _ in workers:
+        kind, ok, errors = results.get()
+        totals[kind][0] += ok
+        totals[kind][1] += errors
+    for worker in workers:
+        worker.join()
+    return {kind: (ok / seconds, errors) for kind, (ok, errors) in totals.items()}
+
+
+if __name__ == '__main__':
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    readers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    seconds = float(sys.argv[3]) if len(sys.argv) > 3 else 5
+    threads = int(sys.argv[4]) if len(sys.argv) > 4 else 1
+
+    print(f"{writers} writer and {readers} reader processes, {threads} threads each, {seconds:.0f}s per run")
+    for name, settings in CONFIGURATIONS:
+        stats = run(settings, writers, readers, seconds, threads)
+        print(f"{name:>22}: "
+              f"writes {stats['write'][0]:8.1f}/s ({stats['write'][1]} errors), "
+              f"reads {stats['read'][0]:8.1f}/s ({stats['read'][1]} errors)")
@@ -0,0 +1,175 @@
+"""
+Change log for incremental sync: every insert, update and delete of a
+synced model writes a row to the `change` table in the same transaction.
+Clients read it through GET /changes and only download what changed.
+
+The cursor is the change id, so ids must become visible in commit order
+or a client could move past an id that commits later. Writes only
+collect (resource, id, action) on the session while the transaction
+runs. The change rows are inserted in a before_commit hook, and on
+PostgreSQL that hook first takes a transaction-level advisory lock. The
+lock is held only from then until the commit, so ids are handed out in
+commit order without serializing the rest of the transaction. SQLite
+only has one writer at a time, which guarantees the same order. Other
+databases don't get this guarantee.
+"""
+import os
+import time
+import click
+from datetime import datetime, timedelta, timezone
+from flask.cli import AppGroup
+from sqlalchemy import event, func, insert, select, delete, text
+from sqlalchemy.orm import object_session
+from models import db, Change, Character, Planet, Vehicle, Favorites
+
+# Resource name in the feed -> model
+SYNCED_MODELS = {
+    "character": Character,
+    "planet": Planet,
+    "vehicle": Vehicle,
+    "favorites": Favorites,
+}
+CHANGE_RETENTION_DAYS = int(os.environ.get("CHANGE_RETENTION_DAYS", 30))
+POLL_INTERVAL_SECONDS = 0.5
+# Arbitrary key for the PostgreSQL advisory lock serializing change log writers
+CHANGE_LOCK_KEY = 0x5357_4348
+# Session.info key holding the changes of the current transaction
+PENDING_CHANGES = "pending_changes"
+
+
+_tracking = False
+
+
+class CursorExpired(Exception):
+    """The requested cursor points to entries that were already compacted."""
+
+
+def lock_change_log(connection):
+    """On PostgreSQL, wait until no other transaction is writing to the change log (released at commit)."""
+    if connection.dialect.name == "postgresql":
+        connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": CHANGE_LOCK_KEY})
+
+
+def _queue(session, changes):
+    session.info.setdefault(PENDING_CHANGES, []).extend(changes)
+
+
+def _record(resource, action):
+    def listener(mapper, connection, target):
+        _queue(object_session(target), [
+            {"resource": resource, "resource_id": target.id, "action": action}])
+    return listener
+
+
+def _write_pending_changes(session):
+    # Commit flushes after before_commit runs, so flush first to collect the last writes
+    session.flush()
+    pending = session.info.pop(PENDING_CHANGES, None)
+    if pending:
+        lock_change_log(session.connection())
+        session.execute(insert(Change), pending)
+
+
+def _discard_pending_changes(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(PENDING_CHANGES, None)
+
+
+def track_changes():
+    """Register the events that log ORM and bulk writes to synced models."""
+    global _tracking
+    if _tracking:
+        return
+    _tracking = True
+    for resource, model in SYNCED_MODELS.items():
+        for action in ("insert", "update", "delete"):
+            event.listen(model, f"after_{action}", _record(resource, action))
+    event.listen(db.session, "before_commit", _write_pending_changes)
+    event.listen(db.session, "after_transaction_end", _discard_pending_changes)
+
+
+def bulk_insert(table, rows):
+    """Insert rows with one executemany, logging an insert change for each new id if the table is synced.
+
+    Core inserts skip the ORM events, so the ids come back through RETURNING
+    and are logged at commit like ORM writes. Returns the number of rows inserted.
+    """
+    ids = db.session.execute(table.insert().returning(table.c.id), rows).scalars().all()
+    if table.name in SYNCED_MODELS:
+        _queue(db.session(), [
+            {"resource": table.name, "resource_id": row_id, "action": "insert"} for row_id in ids])
+    return len(ids)
+
+
+def changes_since(cursor, limit):
+    """Return (changes, has_more) after `cursor`, with the current row attached to insert/update events.
+
+    Deleted rows come back as tombstones with `data` set to None.
+    """
+    oldest = db.session.execute(select(func.min(Change.id))).scalar()
+    if oldest is not None and cursor < oldest - 1:
+        raise CursorExpired()
+
+    entries = db.session.execute(
+        select(Change).where(Change.id > cursor).order_by(Change.id).limit(limit + 1)
+    ).scalars().all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    # One IN query per resource type for the rows still present
+    wanted = {}
+    for entry in entries:
+        if entry.action != "delete":
+            wanted.setdefault(entry.resource, set()).add(entry.resource_id)
+    rows = {}
+    for resource, ids in wanted.items():
+        model = SYNCED_MODELS[resource]
+        for row in model.query.filter(model.id.in_(ids)):
+            rows[(resource, row.id)] = row.serialize()
+
+    changes = []
+    for entry in entries:
+        change = entry.serialize()
+        if entry.action != "delete":
+            change["data"] = rows.get((entry.resource, entry.resource_id))
+        else:
+            change["data"] = None
+        changes.append(change)
+    return changes, has_more
+
+
+def wait_for_changes(cursor, timeout):
+    """Block until there is a change after `cursor` or `timeout` seconds pass."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        # End the read transaction so the next poll sees new commits
+        db.session.rollback()
+        if db.session.execute(select(Change.id).where(Change.id > cursor).limit(1)).first():
+            return True
+        time.sleep(POLL_INTERVAL_SECONDS)
+    return False
+
+
+def latest_cursor():
+    return db.session.execute(select(func.coalesce(func.max(Change.id), 0))).scalar()
+
+
+def compact_changes(retention_days=CHANGE_RETENTION_DAYS):
+    """Delete entries older than the retention period, always keeping the newest one."""
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    newest = latest_cursor()
+    result = db.session.execute(
+        delete(Change).where(Change.created_at < cutoff, Change.id < newest))
+    db.session.commit()
+    return result.rowcount
+
+
+changes_cli = AppGroup("changes", help="Manage the change feed.")
+
+
+@changes_cli.command("compact")
+@click.option("--days", default=CHANGE_RETENTION_DAYS, show_default=True,
+              help="Keep entries newer than this many days.")
+def compact_command(days):
+    """Delete change feed entries past the retention period."""
+    click.echo(f"Deleted {compact_changes(days)} change entries")
@@ -0,0 +1,44 @@
+"""
+Measure the import time of the wsgi entry point with `python -X importtime`
+and fail when it goes over budget.
+
+Usage: python src/import_budget.py [mode] [budget_ms]
+"""
+import os
+import subprocess
+import sys
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BUDGET_MS = {"api": 600, "admin": 1000, "full": 1000}
+
+
+def measure_import_time(mode):
+    """Return (total_ms, [(cumulative_ms, module), ...]) for importing wsgi in the given mode, slowest first."""
+    env = dict(os.environ, APP_MODE=mode)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import wsgi"],
+        cwd=SRC_DIR, env=env, capture_output=True, text=True, check=True)
+
+    modules = []
+    for line in result.stderr.splitlines():
+        # Format: "import time: self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((int(cumulative) / 1000, name[1:].rstrip()))
+
+    # Nested imports are indented, top level ones add up to the total
+    top_level = [(ms, name) for ms, name in modules if not name.startswith(" ")]
+    total_ms = sum(ms for ms, _ in top_level)
+    return total_ms, sorted(((ms, name.strip()) for ms, name in modules), reverse=True)
+
+
+if __name__ == '__main__':
+    mode = sys.argv[1] if len(sys.argv) > 1 else "api"
+    budget_ms = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_BUDGET_MS[mode]
+
+    total_ms, modules = measure_import_time(mode)
+    for ms, name in modules[:15]:
+        print(f"{ms:10.1f} ms  {name}")
+    print(f"Total import time ({mode}): {total_ms:.1f} ms, budget {budget_ms:.0f} ms")
+    sys.exit(0 if total_ms <= budget_ms else 1)
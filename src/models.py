@@ -1,6 +1,6 @@
-import requests
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy import String, Boolean, Integer, Float, ForeignKey
+from datetime import datetime, timezone
+from sqlalchemy import String, Boolean, Integer, Float, ForeignKey, DateTime, func
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
 db = SQLAlchemy()
@@ -27,9 +27,9 @@ class User(db.Model):
 
 class Character(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
-    name: Mapped[str] = mapped_column(String(50), nullable=False)
-    species: Mapped[str] = mapped_column(String(50), nullable=True)
-    homeworld: Mapped[str] = mapped_column(String(50), nullable=True)
+    name: Mapped[str] = mapped_column(String(50), nullable=False, index=True)
+    species: Mapped[str] = mapped_column(String(50), nullable=True, index=True)
+    homeworld: Mapped[str] = mapped_column(String(50), nullable=True, index=True)
     affiliation: Mapped[str] = mapped_column(String(50), nullable=True)
 
     # Relationships
@@ -50,7 +50,7 @@ class Character(db.Model):
 class Planet(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
-    climate: Mapped[str] = mapped_column(String(50), nullable=True)
+    climate: Mapped[str] = mapped_column(String(50), nullable=True, index=True)
     terrain: Mapped[str] = mapped_column(String(50), nullable=True)
     population: Mapped[int] = mapped_column(nullable=True)
 
@@ -73,7 +73,8 @@ class Vehicle(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(50), unique=True, nullable=False)
     model: Mapped[str] = mapped_column(String(50), nullable=True)
-    manufacturer: Mapped[str] = mapped_column(String(50), nullable=True)
+    manufacturer: Mapped[str] = mapped_column(
+        String(50), nullable=True, index=True)
     cost_in_credits: Mapped[str] = mapped_column(String(50), nullable=True)
     length: Mapped[float] = mapped_column(nullable=True)
     max_atmosphering_speed: Mapped[str] = mapped_column(
@@ -102,13 +103,14 @@ class Vehicle(db.Model):
 
 class Favorites(db.Model):
     id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey("user.id"), nullable=False)
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id"), nullable=False, index=True)
     character_id: Mapped[int] = mapped_column(
-        ForeignKey("character.id"), nullable=True)
+        ForeignKey("character.id"), nullable=True, index=True)
     planet_id: Mapped[int] = mapped_column(
-        ForeignKey("planet.id"), nullable=True)
+        ForeignKey("planet.id"), nullable=True, index=True)
     vehicle_id: Mapped[int] = mapped_column(
-        ForeignKey("vehicle.id"), nullable=True)
+        ForeignKey("vehicle.id"), nullable=True, index=True)
 
     # Relationships
     user = relationship("User", back_populates="favorites")
@@ -125,11 +127,38 @@ class Favorites(db.Model):
             "vehicle_id": self.vehicle_id
         }
 
+# Change Model (feed of inserts, updates and deletes for incremental sync)
+
+
+class Change(db.Model):
+    id: Mapped[int] = mapped_column(primary_key=True)
+    resource: Mapped[str] = mapped_column(String(20), nullable=False)
+    resource_id: Mapped[int] = mapped_column(nullable=False)
+    action: Mapped[str] = mapped_column(String(10), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
+
+    def serialize(self):
+        return {
+            "cursor": self.id,
+            "resource": self.resource,
+            "id": self.resource_id,
+            "action": self.action,
+            "created_at": self.created_at_utc().isoformat() if self.created_at else None
+        }
+
+    def created_at_utc(self):
+        # SQLite hands back CURRENT_TIMESTAMP (UTC) without a timezone
+        if self.created_at.tzinfo is None:
+            return self.created_at.replace(tzinfo=timezone.utc)
+        return self.created_at.astimezone(timezone.utc)
+
 # Function to Fetch Data from SWAPI
 
 
 def fetch_swapi_data():
     """Fetch characters, planets, and vehicles from SWAPI.dev and store them in the database."""
+    import requests  # Imported lazily, only the fetch endpoint needs it
 
     # Fetch Characters
     character_url = "https://swapi.dev/api/people/"
@@ -0,0 +1,190 @@
+"""
+Offline snapshots of the database: gzip compressed NDJSON that can be
+exported from a populated database and bulk loaded into an empty one.
+
+The first line is a header, every other line is one row:
+    {"format": "starwars-snapshot", "version": 1}
+    {"table": "character", "row": {"name": "Luke Skywalker", ...}}
+    {"table": "favorites", "row": {"user": "a@b.com", "character": "Luke Skywalker", ...}}
+
+Ids are not exported. Favorites point to their user by email and to
+characters, planets and vehicles by name, and are resolved on import.
+Character names are not unique, so a favorite on a name shared by more
+than one row is refused on export and on import instead of being
+attached to one of them.
+"""
+import gzip
+import json
+import click
+from flask.cli import AppGroup
+from sqlalchemy import func, select
+from models import db, User, Character, Planet, Vehicle, Favorites
+from changes import bulk_insert
+
+SNAPSHOT_FORMAT = "starwars-snapshot"
+SNAPSHOT_VERSION = 1
+BATCH_SIZE = 1000
+
+# Tables in load order, with the natural key used to reference their rows
+ENTITIES = {
+    "user": (User, "email"),
+    "character": (Character, "name"),
+    "planet": (Planet, "name"),
+    "vehicle": (Vehicle, "name"),
+}
+FAVORITE_REFERENCES = ("user", "character", "planet", "vehicle")
+
+# Placeholder id for natural keys that match more than one row
+AMBIGUOUS = object()
+
+
+def _entity_rows(model):
+    columns = [column for column in model.__table__.columns if not column.primary_key]
+    result = db.session.execute(
+        select(*columns).order_by(model.id).execution_options(yield_per=BATCH_SIZE))
+    for row in result:
+        yield dict(row._mapping)
+
+
+def _favorite_rows():
+    # Natural keys are joined in so each favorite is written without extra lookups
+    query = (
+        select(User.email.label("user"), Character.name.label("character"),
+               Planet.name.label("planet"), Vehicle.name.label("vehicle"))
+        .select_from(Favorites)
+        .join(User, Favorites.user_id == User.id)
+        .outerjoin(Character, Favorites.character_id == Character.id)
+        .outerjoin(Planet, Favorites.planet_id == Planet.id)
+        .outerjoin(Vehicle, Favorites.vehicle_id == Vehicle.id)
+        .order_by(Favorites.id)
+        .execution_options(yield_per=BATCH_SIZE))
+    for row in db.session.execute(query):
+        yield {key: value for key, value in row._mapping.items() if value is not None}
+
+
+def _check_favorite_references():
+    """Raise ValueError if a favorite points to a row whose natural key is shared with another row."""
+    for reference in FAVORITE_REFERENCES:
+        model, key = ENTITIES[reference]
+        column = getattr(model, key)
+        duplicated = select(column).group_by(column).having(func.count() > 1)
+        name = db.session.execute(
+            select(column).join(Favorites, getattr(Favorites, f"{reference}_id") == model.id)
+            .where(column.in_(duplicated)).limit(1)).scalar()
+        if name is not None:
+            raise ValueError(f"A favorite references {reference} {name!r}, which is not unique. "
+                             f"Remove the duplicate {reference} rows before exporting.")
+
+
+def export_snapshot(path):
+    """Write every table to a snapshot file, returns the number of rows written.
+
+    Raises ValueError before writing anything if a favorite can't be exported unambiguously.
+    """
+    _check_favorite_references()
+    written = 0
+    with gzip.open(path, "wt", encoding="utf-8") as snapshot:
+        snapshot.write(json.dumps({"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION}) + "\n")
+        for table, (model, _) in ENTITIES.items():
+            for row in _entity_rows(model):
+                snapshot.write(json.dumps({"table": table, "row": row}) + "\n")
+                written += 1
+        for row in _favorite_rows():
+            snapshot.write(json.dumps({"table": "favorites", "row": row}) + "\n")
+            written += 1
+    return written
+
+
+def _natural_key_ids():
+    """Map natural keys to ids for every table a favorite can reference, duplicated keys map to AMBIGUOUS."""
+    ids = {}
+    for table, (model, key) in ENTITIES.items():
+        ids[table] = {}
+        for name, row_id in db.session.execute(select(getattr(model, key), model.id)):
+            ids[table][name] = AMBIGUOUS if name in ids[table] else row_id
+    return ids
+
+
+def _resolve_favorite(row, ids):
+    favorite = {}
+    for reference in FAVORITE_REFERENCES:
+        if row.get(reference) is None:
+            continue
+        try:
+            favorite[f"{reference}_id"] = ids[reference][row[reference]]
+        except KeyError:
+            raise ValueError(f"Favorite references unknown {reference} {row[reference]!r}")
+        if favorite[f"{reference}_id"] is AMBIGUOUS:
+            raise ValueError(f"Favorite references {reference} {row[reference]!r}, which matches more than one row")
+    return favorite
+
+
+def import_snapshot(path):
+    """Stream a snapshot file into the database in batches, returns the number of rows loaded.
+
+    Rows are inserted in one transaction, nothing is loaded if the file is invalid.
+    Loaded rows are written to the change feed in the same transaction.
+    """
+    tables = {table: model.__table__ for table, (model, _) in ENTITIES.items()}
+    tables["favorites"] = Favorites.__table__
+    batches = {table: [] for table in tables}
+    ids = None
+    loaded = 0
+
+    def flush(table):
+        if batches[table]:
+            bulk_insert(tables[table], batches[table])
+            batches[table] = []
+
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as snapshot:
+            header = json.loads(next(snapshot, "{}"))
+            if header.get("format") != SNAPSHOT_FORMAT:
+                raise ValueError(f"{path} is not a {SNAPSHOT_FORMAT} file")
+            if header.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported snapshot version {header.get('version')}")
+
+            for line in snapshot:
+                record = json.loads(line)
+                table, row = record["table"], record["row"]
+                if table not in tables:
+                    raise ValueError(f"Unknown table {table!r} in snapshot")
+                if table == "favorites":
+                    if ids is None:
+                        # Entities always come first, so they can be resolved once
+                        for entity in ENTITIES:
+                            flush(entity)
+                        ids = _natural_key_ids()
+                    row = _resolve_favorite(row, ids)
+                batches[table].append(row)
+                if len(batches[table]) >= BATCH_SIZE:
+                    flush(table)
+                loaded += 1
+
+        for table in tables:
+            flush(table)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return loaded
+
+
+snapshot_cli = AppGroup("snapshot", help="Export or load offline database snapshots.")
+
+
+@snapshot_cli.command("export")
+@click.argument("path")
+def export_command(path):
+    """Export the database to a .ndjson.gz snapshot."""
+    click.echo(f"Exported {export_snapshot(path)} rows to {path}")
+
+
+@snapshot_cli.command("import")
+@click.argument("path")
+@click.option("--create-tables", is_flag=True, help="Create missing tables before loading.")
+def import_command(path, create_tables):
+    """Load a .ndjson.gz snapshot into the database."""
+    if create_tables:
+        db.create_all()
+    click.echo(f"Loaded {import_snapshot(path)} rows from {path}")
@@ -0,0 +1,115 @@
+"""
+Production settings for the SQLite fallback database.
+
+Every connection gets WAL journaling, synchronous=NORMAL, a larger page
+cache, memory mapped reads and a busy timeout, so readers never wait for
+the writer and writers wait for each other instead of failing with
+"database is locked".
+
+Writers also queue on an flock of a `<database>.lock` file next to the
+database. It is taken at the first INSERT/UPDATE/DELETE of a transaction
+and released at commit or rollback. gunicorn workers are separate
+processes, and this lets them wait their turn outside SQLite's busy
+handler, which sleeps in growing steps and often oversleeps the moment
+the lock is freed. Each acquisition opens its own file description, so
+threads of one worker queue too. Waiting longer than the busy timeout
+raises WriterLockTimeout. SQLITE_WRITER_LOCK=off keeps only the busy
+timeout, and platforms without fcntl skip the lock.
+
+Set SQLITE_PROFILE=off to keep the SQLite defaults.
+"""
+import os
+import time
+import logging
+from sqlalchemy import event
+
+try:
+    import fcntl
+except ImportError:  # Windows, writes are coordinated by busy_timeout alone
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", 5000))
+PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # Negative means KiB, so 64 MB
+    "mmap_size": 256 * 1024 * 1024,
+    "busy_timeout": BUSY_TIMEOUT_MS,
+    "temp_store": "MEMORY",
+}
+WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+# How often a queued writer retries the lock file
+LOCK_POLL_SECONDS = 0.001
+
+
+class WriterLockTimeout(Exception):
+    """Another writer held the SQLite writer lock for longer than the busy timeout."""
+
+
+def is_enabled():
+    return os.environ.get("SQLITE_PROFILE", "on").lower() not in ("off", "0", "false")
+
+
+def writer_lock_enabled():
+    return fcntl is not None and os.environ.get("SQLITE_WRITER_LOCK", "on").lower() not in ("off", "0", "false")
+
+
+def _on_connect(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+
+def _acquire(lock_path):
+    """Open the lock file and flock it exclusively, returns the file descriptor."""
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    deadline = time.monotonic() + BUSY_TIMEOUT_MS / 1000
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                logger.error("Timed out after %d ms waiting for SQLite writer lock %s", BUSY_TIMEOUT_MS, lock_path)
+                raise WriterLockTimeout(f"Timed out waiting for the SQLite writer lock {lock_path}")
+            time.sleep(LOCK_POLL_SECONDS)
+
+
+def _release(info):
+    fd = info.pop("sqlite_writer_fd", None)
+    if fd is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def apply_sqlite_profile(engine):
+    """Register the pragmas, and the writer lock for file databases, on a SQLite engine."""
+    event.listen(engine, "connect", _on_connect)
+
+    database = engine.url.database
+    if not writer_lock_enabled() or not database or database == ":memory:":
+        return
+    lock_path = f"{database}.lock"
+
+    def before_execute(connection, cursor, statement, parameters, context, executemany):
+        if "sqlite_writer_fd" in connection.info or not statement.lstrip().upper().startswith(WRITE_STATEMENTS):
+            return
+        connection.info["sqlite_writer_fd"] = _acquire(lock_path)
+
+    event.listen(engine, "before_cursor_execute", before_execute)
+
+    def end_transaction(connection, finish):
+        if "sqlite_writer_fd" in connection.info:
+            # These events fire before SQLAlchemy ends the transaction, so end it here
+            # first (its own commit/rollback is then a no-op) and only then let the next writer in
+            finish(connection.connection.dbapi_connection)
+            _release(connection.info)
+
+    event.listen(engine, "commit", lambda connection: end_transaction(connection, lambda c: c.commit()))
+    event.listen(engine, "rollback", lambda connection: end_transaction(connection, lambda c: c.rollback()))
+    # Safety net for connections returned to the pool without a commit or rollback event
+    event.listen(engine, "checkin", lambda dbapi_connection, record: _release(record.info))
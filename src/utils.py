@@ -1,6 +1,10 @@
 from flask import jsonify, url_for
 
 
+# Largest id a database INTEGER/BIGINT column can hold (64-bit signed)
+MAX_ID = 2 ** 63 - 1
+
+
 class APIException(Exception):
     """Custom API Exception for handling errors."""
     status_code = 400
@@ -19,6 +23,28 @@ class APIException(Exception):
         return rv
 
 
+def parse_ids(raw, max_ids):
+    """Parse a comma separated list of ids ("1,2,3"), raising APIException if invalid or too long."""
+    try:
+        ids = sorted({int(part) for part in raw.split(",") if part.strip()})
+    except ValueError:
+        raise APIException("ids must be a comma separated list of integers")
+    if not ids:
+        raise APIException("ids must not be empty")
+    if ids[0] < 1 or ids[-1] > MAX_ID:
+        raise APIException(f"ids must be between 1 and {MAX_ID}")
+    if len(ids) > max_ids:
+        raise APIException(f"At most {max_ids} ids can be requested at once")
+    return ids
+
+
+def get_by_ids(model, ids):
+    """Load the rows with the given ids in one IN query, returns (serialized rows ordered by id, missing ids)."""
+    rows = model.query.filter(model.id.in_(ids)).order_by(model.id).all()
+    found = {row.id for row in rows}
+    return [row.serialize() for row in rows], [i for i in ids if i not in found]
+
+
 def has_no_empty_params(rule):
     """Check if a route has no empty parameters."""
     defaults = rule.defaults if rule.defaults is not None else ()
@@ -28,7 +54,7 @@ def has_no_empty_params(rule):
 
 def generate_sitemap(app):
     """Generate a sitemap for all API endpoints."""
-    links = ['/admin/']
+    links = ['/admin/'] if 'admin' in app.extensions else []
     for rule in app.url_map.iter_rules():
         if "GET" in rule.methods and has_no_empty_params(rule):
             url = url_for(rule.endpoint, **(rule.defaults or {}))
@@ -1,7 +1,14 @@
 # This file was created to run the application on heroku using gunicorn.
 # Read more about it here: https://devcenter.heroku.com/articles/python-gunicorn
+#
+# The deployment mode comes from APP_MODE ("full", "api" or "admin"), so the
+# API and the admin can run as separate processes:
+#   APP_MODE=api gunicorn wsgi --chdir ./src/
+#   APP_MODE=admin gunicorn wsgi --chdir ./src/
 
-from app import app as application
+from app import create_app
+
+application = create_app()
 
 if __name__ == "__main__":
     application.run()
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from app import create_app  # noqa: E402
+from models import db, Character, Planet, Vehicle  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """API app on a fresh SQLite file with characters, planets and vehicles 1-5."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app("api")
+    with app.app_context():
+        db.create_all()
+        for model in (Character, Planet, Vehicle):
+            db.session.execute(model.__table__.insert(), [{"name": f"{model.__name__} {i}"} for i in range(1, 6)])
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def queries(app):
+    """List of SQL statements executed while the test runs."""
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", count)
+    yield statements
+    event.remove(engine, "before_cursor_execute", count)
@@ -0,0 +1,39 @@
+def test_batch_get_uses_one_query(client, queries):
+    response = client.get('/character?ids=3,1,2')
+
+    assert response.status_code == 200
+    assert len(queries) == 1
+    assert "IN" in queries[0]
+
+
+def test_batch_get_orders_by_id_and_reports_missing(client):
+    response = client.get('/planets?ids=4,99,2,2,42')
+
+    assert [planet["id"] for planet in response.json["results"]] == [2, 4]
+    assert response.json["missing"] == [42, 99]
+
+
+def test_batch_get_rejects_bad_ids(client):
+    assert client.get('/vehicles?ids=a,b').status_code == 400
+    assert client.get('/vehicles?ids=0').status_code == 400
+    assert client.get('/vehicles?ids=99999999999999999999').status_code == 400
+    assert client.get('/vehicles?ids=' + ",".join(str(i) for i in range(1, 102))).status_code == 400
+
+
+def test_resolve_uses_one_query_per_table(client, queries):
+    response = client.get('/resolve?character=5,1&planets=2,77&vehicles=3')
+
+    assert response.status_code == 200
+    assert len(queries) == 3
+    assert [c["id"] for c in response.json["character"]["results"]] == [1, 5]
+    assert response.json["character"]["missing"] == []
+    assert [p["id"] for p in response.json["planets"]["results"]] == [2]
+    assert response.json["planets"]["missing"] == [77]
+    assert [v["id"] for v in response.json["vehicles"]["results"]] == [3]
+
+
+def test_resolve_limits_total_ids(client):
+    ids = ",".join(str(i) for i in range(1, 51))
+
+    assert client.get(f'/resolve?character={ids}&planets={ids}&vehicles=1').status_code == 400
+    assert client.get('/resolve').status_code == 400
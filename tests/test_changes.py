@@ -0,0 +1,60 @@
+from datetime import datetime
+
+
+def test_created_at_is_utc_with_offset(client):
+    client.post('/character', json={"name": "Luke"})
+
+    change = client.get('/changes').json["changes"][0]
+
+    assert change["created_at"].endswith("+00:00")
+    assert datetime.fromisoformat(change["created_at"]).utcoffset().total_seconds() == 0
+
+
+def test_lock_is_taken_only_at_commit(app, queries, monkeypatch):
+    import changes
+    from models import db, Character, Planet
+    locks = []
+    monkeypatch.setattr(changes, "lock_change_log", lambda connection: locks.append(len(queries)))
+
+    with app.app_context():
+        db.session.add(Character(name="Luke"))
+        db.session.flush()
+        db.session.add(Planet(name="Tatooine"))
+        db.session.flush()
+        assert locks == []
+
+        db.session.commit()
+
+    # Taken once, after every write of the transaction and right before the change rows
+    assert len(locks) == 1
+    writes = [q for q in queries[:locks[0]] if q.startswith("INSERT")]
+    assert [w.split()[2] for w in writes] == ["character", "planet"]
+    assert queries[locks[0]].startswith("INSERT INTO change")
+
+
+def test_rolled_back_writes_are_not_logged(app):
+    from models import db, Character, Change
+
+    with app.app_context():
+        db.session.add(Character(name="Ghost"))
+        db.session.flush()
+        db.session.rollback()
+        db.session.add(Character(name="Luke"))
+        db.session.commit()
+
+        assert [(c.resource, c.action) for c in Change.query] == [("character", "insert")]
+
+
+def test_bulk_insert_is_logged_at_commit(app):
+    from changes import bulk_insert
+    from models import db, Planet, Change
+
+    with app.app_context():
+        inserted = bulk_insert(Planet.__table__, [{"name": "Hoth"}, {"name": "Endor"}])
+        assert inserted == 2
+        assert Change.query.count() == 0
+
+        db.session.commit()
+        names = {p.id: p.name for p in Planet.query}
+        logged = [names[c.resource_id] for c in Change.query.filter_by(resource="planet")]
+        assert sorted(logged) == ["Endor", "Hoth"]
@@ -0,0 +1,56 @@
+import os
+import threading
+
+import pytest
+
+from models import db, Character, Change
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("TEST_DATABASE_URL", "").startswith("postgresql"),
+    reason="set TEST_DATABASE_URL to a disposable PostgreSQL database")
+
+
+@pytest.fixture
+def pg_app(monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", os.environ["TEST_DATABASE_URL"])
+    from app import create_app
+    app = create_app("api")
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+def test_long_import_does_not_block_other_writers(pg_app):
+    from changes import bulk_insert
+    imported = threading.Event()
+    finish_import = threading.Event()
+
+    def long_import():
+        with pg_app.app_context():
+            bulk_insert(Character.__table__, [{"name": f"Clone {i}"} for i in range(100)])
+            imported.set()
+            finish_import.wait(10)
+            db.session.commit()
+
+    importer = threading.Thread(target=long_import)
+    importer.start()
+    assert imported.wait(10)
+
+    # The import hasn't committed, so it must not hold the change log lock yet
+    response = pg_app.test_client().post('/character', json={"name": "Luke"})
+    assert response.status_code == 201
+
+    finish_import.set()
+    importer.join(10)
+    with pg_app.app_context():
+        ids = [c.resource_id for c in Change.query.order_by(Change.id)]
+        luke = Character.query.filter_by(name="Luke").one()
+
+    # Change ids follow commit order: Luke committed first
+    assert len(ids) == 101
+    assert ids[0] == luke.id
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+import sqlite_profile
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setenv("SQLITE_WRITER_LOCK", "on")
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    sqlite_profile.apply_sqlite_profile(engine)
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE item (id INTEGER PRIMARY KEY)"))
+    yield engine
+    engine.dispose()
+
+
+def test_pragmas_are_applied(engine):
+    with engine.connect() as connection:
+        assert connection.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert connection.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+
+
+def test_second_writer_waits_for_the_first_to_commit(engine):
+    events = []
+    first_wrote = threading.Event()
+
+    def second_writer():
+        first_wrote.wait(5)
+        with engine.begin() as connection:
+            connection.execute(text("INSERT INTO item DEFAULT VALUES"))
+            events.append("second wrote")
+
+    thread = threading.Thread(target=second_writer)
+    thread.start()
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO item DEFAULT VALUES"))
+        first_wrote.set()
+        time.sleep(0.2)
+        events.append("first committing")
+    thread.join(5)
+
+    assert events == ["first committing", "second wrote"]
+
+
+def test_waiting_past_the_busy_timeout_raises(engine, monkeypatch):
+    monkeypatch.setattr(sqlite_profile, "BUSY_TIMEOUT_MS", 50)
+    with engine.begin() as first:
+        first.execute(text("INSERT INTO item DEFAULT VALUES"))
+        with engine.connect() as second:
+            with pytest.raises(sqlite_profile.WriterLockTimeout):
+                second.execute(text("INSERT INTO item DEFAULT VALUES"))
+
+
+def test_lock_is_released_after_rollback(engine):
+    with engine.connect() as connection:
+        connection.execute(text("INSERT INTO item DEFAULT VALUES"))
+        connection.rollback()
+    with engine.begin() as connection:
+        connection.execute(text("INSERT INTO item DEFAULT VALUES"))
+        assert connection.execute(text("SELECT count(*) FROM item")).scalar() == 1